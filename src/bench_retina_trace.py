@@ -0,0 +1,115 @@
+import math
+import time
+import argparse
+import shlex
+import subprocess
+import requests
+
+# ✅ 고해상도(devicePixelRatio=2) 뷰포트 트레이스로 요청 수 / 지연 비교
+#   - 256px: 화면을 채우기 위해 z+1 타일을 요청 (기존 방식)
+#   - @2x  : z 타일 하나당 512px 한 장 요청
+#   서버 메모리 캐시가 앞 단계 결과로 데워지지 않도록 --server_cmd를 주면 단계마다 서버를 새로 띄움
+#   (OS 페이지 캐시는 root 권한 없이 비울 수 없으므로 공통으로 데워진 상태에서 비교됨)
+
+# 위경도 → 타일 좌표
+def deg2num(lat, lon, zoom):
+    lat_rad = math.radians(lat)
+    n = 2.0 ** zoom
+    xtile = int((lon + 180.0) / 360.0 * n)
+    ytile = int((1.0 - math.log(math.tan(lat_rad) + (1 / math.cos(lat_rad))) / math.pi) / 2.0 * n)
+    return xtile, ytile
+
+# ✅ 뷰포트(CSS 픽셀)를 덮는 타일 목록
+def viewport_tiles(lon, lat, z, width, height):
+    cx, cy = deg2num(lat, lon, z)
+    half_w = math.ceil(width / 256 / 2)
+    half_h = math.ceil(height / 256 / 2)
+    return [(z, x, y) for x in range(cx - half_w, cx + half_w + 1) for y in range(cy - half_h, cy + half_h + 1)]
+
+# ✅ 팬/줌 트레이스: 중심에서 시작해 줌 인 하면서 동쪽으로 이동
+def make_trace(lon, lat, zooms, steps):
+    trace = []
+    for z in zooms:
+        for step in range(steps):
+            trace.append((lon + step * 360.0 / 2 ** z, lat, z))
+    return trace
+
+def run(session, urls):
+    latencies = []
+    start = time.perf_counter()
+    for url in urls:
+        t0 = time.perf_counter()
+        r = session.get(url, timeout=30)
+        r.content
+        latencies.append(time.perf_counter() - t0)
+    return time.perf_counter() - start, sorted(latencies)
+
+def summarize(name, total, latencies):
+    p50 = latencies[len(latencies) // 2] * 1000
+    p95 = latencies[int(len(latencies) * 0.95) - 1] * 1000
+    print(f"[{name}] requests={len(latencies)} total={total:.2f}s p50={p50:.1f}ms p95={p95:.1f}ms")
+
+# ✅ 서버 재시작 (단계 간 메모리 캐시 초기화)
+def start_server(cmd, base):
+    proc = subprocess.Popen(shlex.split(cmd), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    probe = base.split('/tiles/')[0] + '/'
+    for _ in range(100):
+        try:
+            requests.get(probe, timeout=1)
+            return proc
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    proc.terminate()
+    raise RuntimeError(f"server did not start: {cmd}")
+
+def run_phase(name, urls, server_cmd, base, repeat=1):
+    proc = start_server(server_cmd, base) if server_cmd else None
+    try:
+        with requests.Session() as session:
+            for i in range(repeat):
+                total, latencies = run(session, urls)
+                label = name if repeat == 1 else f"{name} {'cold' if i == 0 else 'warm'}"
+                summarize(label, total, latencies)
+    finally:
+        if proc:
+            proc.terminate()
+            proc.wait()
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--base', type=str, default="http://127.0.0.1:8090/tiles/korea", help='타일 라우트 prefix')
+    parser.add_argument('--center', type=float, nargs=2, default=[126.9780, 37.5665], help='시작 중심 (lon lat)')
+    parser.add_argument('--min_zoom', type=int, default=12)
+    parser.add_argument('--max_zoom', type=int, default=15)
+    parser.add_argument('--steps', type=int, default=5, help='줌 레벨당 팬 횟수')
+    parser.add_argument('--width', type=int, default=1280, help='뷰포트 폭 (CSS 픽셀)')
+    parser.add_argument('--height', type=int, default=800, help='뷰포트 높이 (CSS 픽셀)')
+    parser.add_argument('--server_cmd', type=str, default=None, help='단계마다 재시작할 서버 명령 (예: "python run_osm_mtileserver.py")')
+    return parser.parse_args()
+
+def main():
+    args = parse_args()
+    lon, lat = args.center
+    trace = make_trace(lon, lat, range(args.min_zoom, args.max_zoom + 1), args.steps)
+
+    # 브라우저 캐시처럼 같은 타일은 한 번만 요청
+    tiles_1x, tiles_2x = [], []
+    seen_1x, seen_2x = set(), set()
+    for vlon, vlat, z in trace:
+        for t in viewport_tiles(vlon, vlat, z + 1, args.width * 2, args.height * 2):
+            if t not in seen_1x:
+                seen_1x.add(t)
+                tiles_1x.append(t)
+        for t in viewport_tiles(vlon, vlat, z, args.width, args.height):
+            if t not in seen_2x:
+                seen_2x.add(t)
+                tiles_2x.append(t)
+
+    # @2x를 먼저 측정해 256px 단계가 데운 자식 타일 캐시의 이득을 받지 않게 함
+    urls_2x = [f"{args.base}/{z}/{x}/{y}@2x.png" for z, x, y in tiles_2x]
+    urls_1x = [f"{args.base}/{z}/{x}/{y}.png" for z, x, y in tiles_1x]
+    run_phase("@2x", urls_2x, args.server_cmd, args.base, repeat=2)
+    run_phase("256px", urls_1x, args.server_cmd, args.base)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+import os
+import gzip
+import math
+import sqlite3
+import argparse
+import geopandas as gpd
+import mapbox_vector_tile
+from shapely.geometry import box
+from shapely.ops import unary_union, linemerge, polygonize
+
+# ✅ 설정
+GEOJSON_PATH = "../data/korea_city_boundaries.geojson"
+OUTPUT_FILE = "./korea_boundaries.mbtiles"
+LAYER_NAME = "boundaries"
+EXTENT = 4096
+BUFFER = 64                    # 타일 경계 버퍼 (extent 단위)
+SIMPLIFY_PX = 1.0              # 줌별 단순화 허용 오차 (픽셀)
+WORLD = 20037508.342789244     # EPSG:3857 반경
+PROPERTIES = ["CTPRVN_CD", "CTP_ENG_NM", "CTP_KOR_NM"]
+
+# 위경도 → 타일 좌표
+def deg2num(lat, lon, zoom):
+    lat_rad = math.radians(lat)
+    n = 2.0 ** zoom
+    xtile = int((lon + 180.0) / 360.0 * n)
+    ytile = int((1.0 - math.log(math.tan(lat_rad) + (1 / math.cos(lat_rad))) / math.pi) / 2.0 * n)
+    return xtile, ytile
+
+# 타일 좌표 → EPSG:3857 범위 (minx, miny, maxx, maxy)
+def tile_bounds(z, x, y):
+    size = 2 * WORLD / (2 ** z)
+    minx = -WORLD + x * size
+    maxy = WORLD - y * size
+    return minx, maxy - size, minx + size, maxy
+
+# ✅ 시도 경계를 공유 선분(edge) 단위로 분해 (인접 시도가 같은 선분을 공유)
+def build_edges(src):
+    merged = linemerge(unary_union([geom.boundary for geom in src.geometry]))
+    return list(getattr(merged, "geoms", [merged]))
+
+# ✅ 공유 토폴로지 단순화: 선분을 한 번씩만 단순화한 뒤 면을 다시 만들고 원래 시도에 배정
+#    (시도별로 따로 단순화하면 공유 경계가 양쪽에서 달라져 틈/이중선이 생김)
+def simplify_shared(src, edges, tolerance):
+    simplified = unary_union([edge.simplify(tolerance, preserve_topology=False) for edge in edges])
+    owners = {}
+    for face in polygonize(simplified):
+        hits = src.sindex.query(face.representative_point(), predicate="intersects")
+        if len(hits) == 0:
+            continue                     # 어느 시도에도 속하지 않는 면 (섬 사이 바다 등)
+        owners.setdefault(hits[0], []).append(face)
+
+    gdf = src.iloc[sorted(owners)].copy()
+    gdf["geometry"] = [unary_union(owners[i]) for i in sorted(owners)]
+    return gdf
+
+def init_db(path, min_zoom, max_zoom):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.executescript("""
+    CREATE TABLE metadata (name TEXT, value TEXT);
+    CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+    CREATE UNIQUE INDEX tile_index on tiles (zoom_level, tile_column, tile_row);
+    """)
+    metadata = [
+        ('name', 'Korea Boundaries'),
+        ('format', 'pbf'),
+        ('type', 'overlay'),
+        ('version', '1.0'),
+        ('description', 'Province boundaries for Korea (Mapbox Vector Tiles)'),
+        ('minzoom', str(min_zoom)),
+        ('maxzoom', str(max_zoom)),
+        ('bounds', '124.5,33.0,131.0,39.6'),
+        ('center', '127.0,36.3,7'),
+        ('json', '{"vector_layers": [{"id": "%s", "fields": {"CTPRVN_CD": "String", "CTP_ENG_NM": "String", "CTP_KOR_NM": "String"}}]}' % LAYER_NAME),
+    ]
+    cursor.executemany("INSERT INTO metadata VALUES (?, ?)", metadata)
+    conn.commit()
+    return conn
+
+# ✅ 한 타일 인코딩: 클리핑 + MVT 인코딩 + gzip
+def encode_tile(gdf, sindex, z, x, y):
+    minx, miny, maxx, maxy = tile_bounds(z, x, y)
+    pad = (maxx - minx) * BUFFER / EXTENT
+    clip_box = box(minx - pad, miny - pad, maxx + pad, maxy + pad)
+
+    features = []
+    for i in sindex.query(clip_box):
+        row = gdf.iloc[i]
+        geom = row.geometry.intersection(clip_box)
+        if geom.is_empty:
+            continue
+        features.append({
+            "geometry": geom,
+            "properties": {k: str(row[k]) for k in PROPERTIES if k in row},
+        })
+    if not features:
+        return None
+
+    pbf = mapbox_vector_tile.encode(
+        [{"name": LAYER_NAME, "features": features}],
+        default_options={"quantize_bounds": (minx, miny, maxx, maxy), "extents": EXTENT},
+    )
+    return gzip.compress(pbf)
+
+def build(geojson_path, mbtiles_path, min_zoom, max_zoom):
+    src = gpd.read_file(geojson_path).to_crs(epsg=3857)
+    lon_min, lat_min, lon_max, lat_max = src.to_crs(epsg=4326).total_bounds
+    conn = init_db(mbtiles_path, min_zoom, max_zoom)
+    edges = build_edges(src)
+
+    for z in range(min_zoom, max_zoom + 1):
+        # ✅ 줌별 단순화 (1픽셀 = 2*WORLD / (256 * 2^z) 미터)
+        tolerance = SIMPLIFY_PX * 2 * WORLD / (256 * 2 ** z)
+        gdf = simplify_shared(src, edges, tolerance)
+        sindex = gdf.sindex
+
+        x_start, y_start = deg2num(lat_max, lon_min, z)
+        x_end, y_end = deg2num(lat_min, lon_max, z)
+        count = 0
+        for x in range(x_start, x_end + 1):
+            for y in range(y_start, y_end + 1):
+                data = encode_tile(gdf, sindex, z, x, y)
+                if data is None:
+                    continue
+                y_mbtiles = (2 ** z - 1) - y
+                conn.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", (z, x, y_mbtiles, data))
+                count += 1
+        conn.commit()
+        print(f"[Zoom {z}] tiles={count}, tolerance={tolerance:.1f}m")
+
+    conn.close()
+    print(f"[✓] 변환 완료: {mbtiles_path}")
+
+# ✅ 뷰포트 단위 페이로드 비교 (벡터 타일 합계 vs 원본 GeoJSON)
+def report(geojson_path, mbtiles_path, zooms, center, width=1280, height=800):
+    raw_size = os.path.getsize(geojson_path)
+    lon, lat = center
+    # 읽기 전용으로 열어 파일이 없을 때 빈 DB가 생기지 않게 함
+    try:
+        conn = sqlite3.connect(f"file:{mbtiles_path}?mode=ro", uri=True)
+        conn.execute("SELECT 1 FROM tiles LIMIT 1")
+    except sqlite3.OperationalError:
+        print(f"[✗] 벡터 타일 MBTiles가 없거나 비어 있습니다: {mbtiles_path} (--report 없이 먼저 빌드하세요)")
+        return
+    print(f"GeoJSON: {raw_size:,} bytes")
+    for z in zooms:
+        cx, cy = deg2num(lat, lon, z)
+        half_w = math.ceil(width / 256 / 2)
+        half_h = math.ceil(height / 256 / 2)
+        total = 0
+        tiles = 0
+        for x in range(cx - half_w, cx + half_w + 1):
+            for y in range(cy - half_h, cy + half_h + 1):
+                row = conn.execute("""
+                    SELECT length(tile_data) FROM tiles
+                    WHERE zoom_level=? AND tile_column=? AND tile_row=?
+                """, (z, x, (2 ** z - 1) - y)).fetchone()
+                if row:
+                    total += row[0]
+                    tiles += 1
+        print(f"[Zoom {z}] {width}x{height} viewport: {tiles} tiles, {total:,} bytes ({total / raw_size:.2%} of GeoJSON)")
+    conn.close()
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--geojson", type=str, default=GEOJSON_PATH, help="경계 GeoJSON 경로")
+    parser.add_argument("--output", type=str, default=OUTPUT_FILE, help="출력 MBTiles 경로")
+    parser.add_argument("--min_zoom", type=int, default=5, help="최소 줌 레벨")
+    parser.add_argument("--max_zoom", type=int, default=14, help="최대 줌 레벨")
+    parser.add_argument("--report", action="store_true", help="빌드 없이 뷰포트별 페이로드 크기만 출력")
+    parser.add_argument("--center", type=float, nargs=2, default=[127.0, 36.3], help="리포트 뷰포트 중심 (lon lat)")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not args.report:
+        build(args.geojson, args.output, args.min_zoom, args.max_zoom)
+    report(args.geojson, args.output, range(args.min_zoom, args.max_zoom + 1), args.center)
@@ -1,21 +1,80 @@
-from flask import Flask, Response, abort
+from flask import Flask, Response, abort, g, jsonify, request
 import sqlite3
+import json
+import math
+import time
+import threading
 from io import BytesIO
 from PIL import Image
 import argparse
+from collections import OrderedDict
 
 # ✅ argparse로 --map_port, --min_zoom 받기
 parser = argparse.ArgumentParser()
 parser.add_argument('--map_port', type=int, default=8091, help='Port to run the server on')
 parser.add_argument('--min_zoom', type=int, default=10, help='Minimum zoom level allowed for fallback')
 parser.add_argument('--mbtiles', type=str, default="./vworld_korea.mbtiles", help='Path to MBTiles file')
+parser.add_argument('--boundaries', type=str, default="./korea_boundaries.mbtiles", help='Path to boundary vector MBTiles')
+parser.add_argument('--retina_mbtiles', type=str, default=None, help='Path to precomputed @2x MBTiles (optional)')
+parser.add_argument('--cache_mb', type=int, default=64, help='Memory cache size in MB (tiles, overzoom and @2x PNGs share it)')
+parser.add_argument('--warm', action='store_true', help='Warm caches for hot viewports in the background at startup')
+parser.add_argument('--warm_min_zoom', type=int, default=7, help='Minimum zoom level to warm')
+parser.add_argument('--warm_max_zoom', type=int, default=14, help='Maximum zoom level to warm')
+parser.add_argument('--warm_geojson', type=str, default="../data/korea_city_boundaries.geojson", help='Boundary GeoJSON whose city centroids are warmed')
 args = parser.parse_args()
 
 app = Flask(__name__)
 MBTILES_PATH = args.mbtiles
+BOUNDARIES_PATH = args.boundaries
+RETINA_PATH = args.retina_mbtiles
+
+# ✅ 검증 단계(validate_tiles.py)에서 병합된 빈 타일 목록 {tile_data: 'uniform' | 'placeholder'}
+def load_blank_tiles(path):
+    try:
+        conn = sqlite3.connect(path)
+        rows = conn.execute("""
+            SELECT tile_id, tile_data FROM images
+            WHERE tile_id LIKE 'uniform:%' OR tile_id LIKE 'placeholder:%'
+        """).fetchall()
+        conn.close()
+    except sqlite3.OperationalError:
+        return {}
+    return {tile_data: tile_id.split(':', 1)[0] for tile_id, tile_data in rows}
+
+BLANK_TILES = load_blank_tiles(MBTILES_PATH)
+
+# ✅ 바이트 상한이 있는 LRU 메모리 캐시 (tile_data/PNG 바이트만 저장, 없는 타일은 저장하지 않음)
+CACHE = OrderedDict()
+CACHE_LOCK = threading.Lock()
+CACHE_MAX_BYTES = args.cache_mb * 1024 * 1024
+cache_bytes = 0
+
+def cache_get(key):
+    with CACHE_LOCK:
+        data = CACHE.get(key)
+        if data is not None:
+            CACHE.move_to_end(key)
+        return data
+
+def cache_put(key, data):
+    global cache_bytes
+    if not data or len(data) > CACHE_MAX_BYTES:
+        return
+    with CACHE_LOCK:
+        old = CACHE.pop(key, None)
+        if old is not None:
+            cache_bytes -= len(old)
+        CACHE[key] = data
+        cache_bytes += len(data)
+        while cache_bytes > CACHE_MAX_BYTES:
+            _, evicted = CACHE.popitem(last=False)
+            cache_bytes -= len(evicted)
 
 # ✅ 타일 데이터 조회
 def get_tile_data(z, x, y):
+    tile_data = cache_get(('tile', z, x, y))
+    if tile_data is not None:
+        return tile_data
     conn = sqlite3.connect(MBTILES_PATH)
     cursor = conn.cursor()
     flipped_y = (2 ** z - 1) - y
@@ -25,58 +84,282 @@ def get_tile_data(z, x, y):
     """, (z, x, flipped_y))
     row = cursor.fetchone()
     conn.close()
-    return row[0] if row else None
+    tile_data = row[0] if row else None
+    cache_put(('tile', z, x, y), tile_data)
+    return tile_data
 
 # ✅ fallback 타일 조회 (min_zoom까지 내려감)
 def get_best_available_tile(z, x, y):
-    conn = sqlite3.connect(MBTILES_PATH)
-    cursor = conn.cursor()
-
     for fallback_z in range(z - 1, args.min_zoom - 1, -1):
         scale = 2 ** (z - fallback_z)
         tx = x // scale
         ty = y // scale
-        flipped_ty = (2 ** fallback_z - 1) - ty
+        tile_data = get_tile_data(fallback_z, tx, ty)   # 부모 타일은 자기 키로 한 번만 캐시됨
+        if tile_data:
+            return fallback_z, tx, ty, tile_data
+    return None
 
-        cursor.execute("""
-            SELECT tile_data FROM tiles
-            WHERE zoom_level=? AND tile_column=? AND tile_row=?
-        """, (fallback_z, tx, flipped_ty))
-        row = cursor.fetchone()
+# ✅ placeholder 규칙: 모든 경로(256px, fallback, @2x)에서 "데이터 없음" = 투명(그리지 않음)
+def is_placeholder(tile_data):
+    return BLANK_TILES.get(tile_data) == 'placeholder'
 
-        if row:
-            conn.close()
-            return fallback_z, tx, ty, row[0]
+# ✅ 타일 응답 (placeholder는 204, 단색 타일은 캐시 가능한 상수 응답)
+def tile_response(tile_data):
+    kind = BLANK_TILES.get(tile_data)
+    if kind == 'placeholder':
+        return Response(status=204)
+    if kind == 'uniform':
+        return Response(tile_data, mimetype='image/png', headers={'Cache-Control': 'public, max-age=86400'})
+    return Response(tile_data, mimetype='image/png')
+
+# ✅ fallback 이미지 생성 (하위 줌 타일을 잘라 tile_size로 확대)
+def render_fallback(z, x, y, tile_size=256, fallback=None):
+    if fallback is None:
+        fallback = get_best_available_tile(z, x, y)
+    if not fallback or is_placeholder(fallback[3]):
+        return None
+    fallback_z, tx, ty, tile_data = fallback
+    img = Image.open(BytesIO(tile_data))
+
+    scale = 2 ** (z - fallback_z)
+    src_size = 256
+    dx = (x % scale) * (src_size // scale)
+    dy = (y % scale) * (src_size // scale)
+    box = (dx, dy, dx + src_size // scale, dy + src_size // scale)
+
+    return img.crop(box).resize((tile_size, tile_size), resample=Image.LANCZOS)
+
+# ✅ @2x 타일 조립 (z+1 자식 4장 → 512px, 없는 자식은 fallback 확대, placeholder 자리는 투명)
+#    네 자리가 모두 placeholder면 b''를 돌려 256px 경로처럼 204로 응답
+def assemble_retina_tile(z, x, y):
+    cached = cache_get(('retina', z, x, y))
+    if cached is not None:
+        return cached
+    canvas = Image.new('RGBA', (512, 512))
+    found = False
+    placeholder = False
+    for i in range(2):
+        for j in range(2):
+            cx, cy = 2 * x + i, 2 * y + j
+            tile_data = get_tile_data(z + 1, cx, cy)
+            if tile_data is None:
+                fallback = get_best_available_tile(z + 1, cx, cy)
+                if fallback and is_placeholder(fallback[3]):
+                    placeholder = True
+                    continue
+                child = render_fallback(z + 1, cx, cy, fallback=fallback)
+            elif is_placeholder(tile_data):
+                placeholder = True
+                continue
+            else:
+                child = Image.open(BytesIO(tile_data))
+            if child is None:
+                continue
+            canvas.paste(child, (i * 256, j * 256))
+            found = True
+    if not found:
+        return b'' if placeholder else None
+
+    output = BytesIO()
+    canvas.save(output, format='PNG')
+    cache_put(('retina', z, x, y), output.getvalue())
+    return output.getvalue()
 
+# ✅ fallback 결과(PNG) 캐시
+def render_overzoom_tile(z, x, y, fallback=None):
+    cached = cache_get(('overzoom', z, x, y))
+    if cached is not None:
+        return cached
+    img = render_fallback(z, x, y, fallback=fallback)
+    if img is None:
+        return None
+    output = BytesIO()
+    img.save(output, format='PNG')
+    cache_put(('overzoom', z, x, y), output.getvalue())
+    return output.getvalue()
+
+# ✅ 사전 생성된 @2x MBTiles 조회
+def get_retina_tile_data(z, x, y):
+    if not RETINA_PATH:
+        return None
+    conn = sqlite3.connect(RETINA_PATH)
+    flipped_y = (2 ** z - 1) - y
+    row = conn.execute("""
+        SELECT tile_data FROM tiles
+        WHERE zoom_level=? AND tile_column=? AND tile_row=?
+    """, (z, x, flipped_y)).fetchone()
     conn.close()
-    return None
+    return row[0] if row else None
 
 # ✅ 타일 요청 엔드포인트
 @app.route("/tiles/vworld_korea/<int:z>/<int:x>/<int:y>.png")
 def serve_tile(z, x, y):
     tile_data = get_tile_data(z, x, y)
     if tile_data:
-        return Response(tile_data, mimetype='image/png')
+        return tile_response(tile_data)
 
+    # fallback 처리 (빈 타일은 잘라 확대해도 같으므로 그대로 응답)
     fallback = get_best_available_tile(z, x, y)
-    if fallback:
-        fallback_z, tx, ty, tile_data = fallback
-        img = Image.open(BytesIO(tile_data))
+    if fallback and fallback[3] in BLANK_TILES:
+        return tile_response(fallback[3])
+    tile_data = render_overzoom_tile(z, x, y, fallback=fallback)
+    if tile_data:
+        return Response(tile_data, mimetype='image/png')
 
-        scale = 2 ** (z - fallback_z)
-        tile_size = 256
-        dx = (x % scale) * (tile_size // scale)
-        dy = (y % scale) * (tile_size // scale)
-        box = (dx, dy, dx + tile_size // scale, dy + tile_size // scale)
+    return abort(404)
+
+# ✅ 위경도 → 타일 좌표
+def deg2num(lat, lon, zoom):
+    lat_rad = math.radians(lat)
+    n = 2.0 ** zoom
+    xtile = int((lon + 180.0) / 360.0 * n)
+    ytile = int((1.0 - math.log(math.tan(lat_rad) + (1 / math.cos(lat_rad))) / math.pi) / 2.0 * n)
+    return xtile, ytile
+
+# ✅ 워밍 대상 뷰포트: MBTiles metadata center + GeoJSON 시도별 중심점
+def load_hot_viewports():
+    viewports = []
+    try:
+        conn = sqlite3.connect(MBTILES_PATH)
+        row = conn.execute("SELECT value FROM metadata WHERE name='center'").fetchone()
+        conn.close()
+        if row:
+            lon, lat = row[0].split(',')[:2]
+            viewports.append(('center', float(lon), float(lat)))
+    except sqlite3.OperationalError:
+        pass
+
+    try:
+        with open(args.warm_geojson, encoding='utf-8') as f:
+            features = json.load(f)['features']
+    except (OSError, ValueError, KeyError):
+        features = []
+    for feature in features:
+        # geometry/properties가 비어 있거나 좌표 형식이 잘못된 feature는 건너뜀
+        try:
+            coords = feature['geometry']['coordinates']
+            while isinstance(coords[0][0], list):
+                coords = [pt for part in coords for pt in part]
+            lons = [pt[0] for pt in coords]
+            lats = [pt[1] for pt in coords]
+            name = (feature.get('properties') or {}).get('CTP_KOR_NM', '')
+            viewports.append((name, (min(lons) + max(lons)) / 2, (min(lats) + max(lats)) / 2))
+        except (TypeError, KeyError, IndexError, ValueError):
+            continue
+    return viewports
+
+WARM_STATUS = {'state': 'idle', 'tiles': 0, 'seconds': None, 'error': None}
+WARM_LOCK = threading.Lock()
+
+# ✅ 뷰포트(1280x800)를 덮는 타일을 줌 범위만큼 미리 읽어 메모리 / OS 페이지 캐시에 올림
+def warm_cache(width=1280, height=800):
+    start = time.perf_counter()
+    warmed = 0
+    try:
+        viewports = load_hot_viewports()
+        tiles = set()
+        for _, lon, lat in viewports:
+            for z in range(args.warm_min_zoom, args.warm_max_zoom + 1):
+                cx, cy = deg2num(lat, lon, z)
+                half_w = math.ceil(width / 256 / 2)
+                half_h = math.ceil(height / 256 / 2)
+                for x in range(cx - half_w, cx + half_w + 1):
+                    for y in range(cy - half_h, cy + half_h + 1):
+                        tiles.add((z, x, y))
+
+        # 실제로 존재하거나 fallback으로 만들어진 타일만 셈
+        for z, x, y in sorted(tiles):
+            if get_tile_data(z, x, y) is not None:
+                warmed += 1
+                continue
+            fallback = get_best_available_tile(z, x, y)
+            if fallback and (fallback[3] in BLANK_TILES or render_overzoom_tile(z, x, y, fallback=fallback)):
+                warmed += 1
 
-        cropped = img.crop(box).resize((256, 256), resample=Image.LANCZOS)
-        output = BytesIO()
-        cropped.save(output, format='PNG')
-        output.seek(0)
-        return Response(output.read(), mimetype='image/png')
+        # 상태 필드는 한 번에 갱신 (중간 상태가 GET /admin/warm 에 보이지 않게)
+        with WARM_LOCK:
+            WARM_STATUS.update(state='done', tiles=warmed, seconds=round(time.perf_counter() - start, 2), error=None)
+        print(f"[✓] 캐시 워밍 완료: {len(viewports)} viewports, {warmed}/{len(tiles)} tiles, {WARM_STATUS['seconds']:.2f}s")
+    except Exception as e:
+        with WARM_LOCK:
+            WARM_STATUS.update(state='error', tiles=warmed, seconds=round(time.perf_counter() - start, 2), error=str(e))
+        print(f"[✗] 캐시 워밍 실패: {e}")
 
+# ✅ 백그라운드 스레드로 워밍 시작 (서버 준비를 막지 않음)
+def start_warmup():
+    with WARM_LOCK:
+        if WARM_STATUS['state'] == 'running':
+            return False
+        WARM_STATUS.update(state='running', tiles=0, seconds=None, error=None)
+    threading.Thread(target=warm_cache, daemon=True).start()
+    return True
+
+# ✅ 기동 후 1분간 요청 지연 기록 (워밍 전/후 비교용, START_TIME은 app.run 직전에 설정)
+START_TIME = None
+FIRST_MINUTE_LATENCIES = []
+
+@app.before_request
+def record_start():
+    g.request_start = time.perf_counter()
+
+@app.after_request
+def record_latency(response):
+    now = time.perf_counter()
+    if START_TIME is not None and now - START_TIME <= 60 and 'request_start' in g:
+        FIRST_MINUTE_LATENCIES.append(now - g.request_start)
+    return response
+
+def first_minute_stats():
+    latencies = sorted(FIRST_MINUTE_LATENCIES)
+    if not latencies:
+        return {'requests': 0}
+    return {
+        'requests': len(latencies),
+        'p50_ms': round(latencies[len(latencies) // 2] * 1000, 1),
+        'p95_ms': round(latencies[max(0, int(len(latencies) * 0.95) - 1)] * 1000, 1),
+    }
+
+# ✅ 워밍 관리 엔드포인트 (POST: 워밍 시작, GET: 상태 / 첫 1분 지연)
+@app.route("/admin/warm", methods=["GET", "POST"])
+def admin_warm():
+    if request.method == "POST":
+        started = start_warmup()
+        return jsonify(started=started, **WARM_STATUS), 202 if started else 409
+    with WARM_LOCK:
+        status = dict(WARM_STATUS)
+    return jsonify(first_minute=first_minute_stats(), cache_bytes=cache_bytes, **status)
+
+# ✅ 고해상도(@2x, 512px) 타일 엔드포인트
+@app.route("/tiles/vworld_korea/<int:z>/<int:x>/<int:y>@2x.png")
+def serve_retina_tile(z, x, y):
+    tile_data = get_retina_tile_data(z, x, y) or assemble_retina_tile(z, x, y)
+    if tile_data == b'':
+        return Response(status=204)
+    if tile_data:
+        return Response(tile_data, mimetype='image/png')
     return abort(404)
 
+# ✅ 행정경계 벡터 타일 (MVT, gzip 압축 저장)
+@app.route("/tiles/boundaries/<int:z>/<int:x>/<int:y>.pbf")
+def serve_boundary_tile(z, x, y):
+    # 읽기 전용으로 열어 파일이 없을 때 빈 DB가 생기지 않게 함
+    try:
+        conn = sqlite3.connect(f"file:{BOUNDARIES_PATH}?mode=ro", uri=True)
+        flipped_y = (2 ** z - 1) - y
+        row = conn.execute("""
+            SELECT tile_data FROM tiles
+            WHERE zoom_level=? AND tile_column=? AND tile_row=?
+        """, (z, x, flipped_y)).fetchone()
+        conn.close()
+    except sqlite3.OperationalError:
+        return Response(status=204)
+    if not row:
+        return Response(status=204)
+    return Response(row[0], mimetype='application/x-protobuf', headers={'Content-Encoding': 'gzip'})
+
 # ✅ 서버 실행
 if __name__ == "__main__":
+    if args.warm:
+        start_warmup()
+    START_TIME = time.perf_counter()
     app.run(host="0.0.0.0", port=args.map_port)
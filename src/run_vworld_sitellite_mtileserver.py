@@ -1,9 +1,25 @@
-from flask import Flask, send_file, abort
+from flask import Flask, Response, send_file, abort
 import sqlite3
 import os
 
 app = Flask(__name__)
 MBTILES_PATH = r"./vworld_satellite_korea.mbtiles"
+BOUNDARIES_PATH = r"./korea_boundaries.mbtiles"
+
+# ✅ 검증 단계(validate_tiles.py)에서 병합된 빈 타일 목록 (placeholder만 204 응답)
+def load_blank_tiles(path):
+    try:
+        conn = sqlite3.connect(path)
+        rows = conn.execute("""
+            SELECT tile_id, tile_data FROM images
+            WHERE tile_id LIKE 'placeholder:%'
+        """).fetchall()
+        conn.close()
+    except sqlite3.OperationalError:
+        return set()
+    return {tile_data for tile_id, tile_data in rows}
+
+BLANK_TILES = load_blank_tiles(MBTILES_PATH)
 
 def get_tile(z, x, y):
     conn = sqlite3.connect(MBTILES_PATH)
@@ -27,10 +43,30 @@ def get_tile(z, x, y):
 @app.route("/tiles/vworld_sitellite_korea/<int:z>/<int:x>/<int:y>.jpeg")
 def tile(z, x, y):
     tile_data = get_tile(z, x, y)
+    if tile_data in BLANK_TILES:
+        return Response(status=204)
     if tile_data:
         return tile_data, 200, {'Content-Type': 'image/jpeg'}
     else:
         return abort(404)
 
+# ✅ 행정경계 벡터 타일 (MVT, gzip 압축 저장)
+@app.route("/tiles/boundaries/<int:z>/<int:x>/<int:y>.pbf")
+def serve_boundary_tile(z, x, y):
+    # 읽기 전용으로 열어 파일이 없을 때 빈 DB가 생기지 않게 함
+    try:
+        conn = sqlite3.connect(f"file:{BOUNDARIES_PATH}?mode=ro", uri=True)
+        flipped_y = (2 ** z - 1) - y
+        row = conn.execute("""
+            SELECT tile_data FROM tiles
+            WHERE zoom_level=? AND tile_column=? AND tile_row=?
+        """, (z, x, flipped_y)).fetchone()
+        conn.close()
+    except sqlite3.OperationalError:
+        return Response(status=204)
+    if not row:
+        return Response(status=204)
+    return Response(row[0], mimetype='application/x-protobuf', headers={'Content-Encoding': 'gzip'})
+
 if __name__ == "__main__":
     app.run(host="0.0.0.0", port=8092)
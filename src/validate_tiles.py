@@ -0,0 +1,237 @@
+import os
+import sqlite3
+import hashlib
+import argparse
+from io import BytesIO
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+from PIL import Image
+
+# ✅ 타일 검증 / 빈 타일 병합 단계
+#   - 디코딩 실패(잘린/깨진 이미지) → 삭제 후 재다운로드 목록(FAILED_LOG)에 기록
+#     다운로더는 이미 있는 파일을 건너뛰므로, MBTiles 모드에서는 --tile_dir 로 원본 파일도 지워야 다시 받음
+#   - 단색 타일(uniform), --placeholder_hash로 지정한 "데이터 없음" 이미지(placeholder) → 공유 blob 하나로 병합
+#   - 자주 반복되는 이미지는 placeholder 후보로 리포트만 함 (숲/바다 패턴 등 실제 타일일 수 있음)
+#   서버는 MBTiles images 테이블의 tile_id 접두어(uniform:/placeholder:)로 빈 타일을 인식함
+
+FAILED_LOG = "failed_invalid_tiles.txt"
+MAX_WORKERS = os.cpu_count() or 1
+CHUNK = 256
+EXTS = (".png", ".jpeg", ".jpg")
+
+# ✅ 워커: 타일 하나 검사 → (key, 상태, 픽셀 해시, 크기, 오류)
+def inspect(item):
+    key, data = item
+    if data is None:
+        with open(key[3], 'rb') as f:
+            data = f.read()
+    try:
+        img = Image.open(BytesIO(data))
+        img.load()
+    except Exception as e:
+        return key, 'corrupt', None, len(data), str(e)
+
+    extrema = img.getextrema()
+    if not isinstance(extrema[0], tuple):
+        extrema = (extrema,)
+    uniform = all(lo == hi for lo, hi in extrema)
+    # 모드/알파/팔레트까지 포함해야 투명 타일과 검은 타일이 구분됨
+    raw = f"{img.mode}:{img.size}:{img.info.get('transparency')}".encode() + img.tobytes()
+    if img.mode == 'P':
+        raw += bytes(img.getpalette() or [])
+    pixel_hash = hashlib.md5(raw).hexdigest()
+    return key, 'uniform' if uniform else 'ok', pixel_hash, len(data), None
+
+def inspect_chunk(items):
+    return [inspect(item) for item in items]
+
+def chunked(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+# ✅ 동시에 제출하는 묶음 수를 제한 (Executor.map은 입력 전체를 한 번에 제출해 메모리를 다 씀)
+def run_parallel(items, workers):
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in chunked(items, CHUNK):
+            pending.append(executor.submit(inspect_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+# ✅ --placeholder_hash로 지정한 이미지만 placeholder, 반복 횟수가 기준 이상인 이미지는 후보로 출력만 함
+def classify(results, placeholder_min_count, placeholder_hashes):
+    placeholders = set(placeholder_hashes)
+    counts = Counter(h for _, status, h, _, _ in results if status == 'ok' and h not in placeholders)
+    for h, c in counts.most_common():
+        if c < placeholder_min_count:
+            break
+        print(f"[후보] placeholder? {h} ({c}회 반복) - 확인 후 --placeholder_hash 로 지정")
+    classified = []
+    for key, status, h, size, err in results:
+        if status == 'ok' and h in placeholders:
+            status = 'placeholder'
+        classified.append((key, status, h, size, err))
+    return classified
+
+def log_failed(failed_log, corrupt):
+    with open(failed_log, "a") as log:
+        for (z, x, y, _), err in corrupt:
+            log.write(f"{z},{x},{y} - invalid image: {err}\n")
+
+def print_report(classified, reclaimed):
+    counts = Counter(status for _, status, _, _, _ in classified)
+    print(f"[검증] 전체={len(classified)} 정상={counts['ok']} 손상={counts['corrupt']} "
+          f"단색={counts['uniform']} placeholder={counts['placeholder']}")
+    print(f"[✓] 회수한 용량: {reclaimed:,} bytes")
+
+# ✅ 타일 폴더 모드: 손상 파일 삭제, 빈 타일은 하드링크로 공유
+def validate_dir(tile_dir, args):
+    items = []
+    for z in os.listdir(tile_dir):
+        if not z.isdigit():
+            continue
+        for x in os.listdir(os.path.join(tile_dir, z)):
+            if not x.isdigit():
+                continue
+            for y_file in os.listdir(os.path.join(tile_dir, z, x)):
+                name, ext = os.path.splitext(y_file)
+                if ext in EXTS and name.isdigit():
+                    items.append(((int(z), int(x), int(name), os.path.join(tile_dir, z, x, y_file)), None))
+
+    classified = classify(list(run_parallel(items, args.workers)), args.placeholder_min_count, args.placeholder_hash)
+
+    reclaimed = 0
+    corrupt = []
+    shared = {}
+    for key, status, h, size, err in classified:
+        path = key[3]
+        if status == 'corrupt':
+            corrupt.append((key, err))
+            if not args.dry_run:
+                os.remove(path)
+            reclaimed += size
+        elif status in ('uniform', 'placeholder'):
+            ext = os.path.splitext(path)[1]
+            if (h, ext) not in shared:
+                shared[(h, ext)] = path
+                continue
+            if os.path.samefile(shared[(h, ext)], path):
+                continue
+            if not args.dry_run:
+                os.remove(path)
+                os.link(shared[(h, ext)], path)
+            reclaimed += size
+
+    log_failed(args.failed_log, corrupt)
+    print_report(classified, reclaimed)
+
+# ✅ 손상 타일의 원본 파일 삭제 → 다음 다운로더 실행 시 다시 받음
+def remove_source_tiles(tile_dir, corrupt, dry_run):
+    if not corrupt:
+        return
+    if not tile_dir:
+        print(f"[!] 손상 타일 {len(corrupt)}개: 원본 폴더에 파일이 남아 있으면 다운로더가 건너뜀 (--tile_dir 지정 필요)")
+        return
+    removed = 0
+    for (z, x, y, _), _ in corrupt:
+        for ext in EXTS:
+            path = os.path.join(tile_dir, str(z), str(x), f"{y}{ext}")
+            if os.path.exists(path):
+                if not dry_run:
+                    os.remove(path)
+                removed += 1
+    print(f"[✓] 원본 타일 파일 삭제: {removed}개 ({tile_dir})")
+
+# ✅ MBTiles 모드: 손상 행 삭제, map/images 스키마로 중복 제거 (tiles 는 뷰로 유지)
+def validate_mbtiles(mbtiles_path, args):
+    conn = sqlite3.connect(mbtiles_path)
+
+    def rows():
+        for z, x, tile_row, data in conn.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles"):
+            yield (z, x, (2 ** z - 1) - tile_row, None), data
+
+    classified = classify(list(run_parallel(rows(), args.workers)), args.placeholder_min_count, args.placeholder_hash)
+    corrupt = [(key, err) for key, status, _, _, err in classified if status == 'corrupt']
+    log_failed(args.failed_log, corrupt)
+    remove_source_tiles(args.tile_dir, corrupt, args.dry_run)
+
+    if args.dry_run:
+        reclaimed = sum(size for _, status, _, size, _ in classified if status == 'corrupt')
+        print_report(classified, reclaimed)
+        conn.close()
+        return
+
+    tile_ids = {}
+    for (z, x, y, _), status, h, _, _ in classified:
+        if status in ('uniform', 'placeholder'):
+            tile_ids[(z, x, y)] = f"{status}:{h}"
+
+    is_view = conn.execute("SELECT type FROM sqlite_master WHERE name='tiles'").fetchone()[0] == 'view'
+    blob_bytes_before = conn.execute(
+        f"SELECT COALESCE(SUM(length(tile_data)), 0) FROM {'images' if is_view else 'tiles'}").fetchone()[0]
+    conn.executescript("""
+    CREATE TABLE IF NOT EXISTS map (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_id TEXT);
+    CREATE TABLE IF NOT EXISTS images (tile_data BLOB, tile_id TEXT);
+    CREATE TABLE map_new (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_id TEXT);
+    CREATE TABLE images_new (tile_data BLOB, tile_id TEXT);
+    CREATE UNIQUE INDEX images_new_id ON images_new (tile_id);
+    """)
+    # 전체를 메모리에 올리지 않도록 커서로 한 행씩 옮김
+    corrupt_keys = {key[:3] for key, _ in corrupt}
+    reader = conn.cursor()
+    writer = conn.cursor()
+    for z, x, tile_row, data in reader.execute("SELECT zoom_level, tile_column, tile_row, tile_data FROM tiles"):
+        y = (2 ** z - 1) - tile_row
+        if (z, x, y) in corrupt_keys:
+            continue
+        tile_id = tile_ids.get((z, x, y)) or hashlib.md5(data).hexdigest()
+        writer.execute("INSERT OR IGNORE INTO images_new VALUES (?, ?)", (data, tile_id))
+        writer.execute("INSERT INTO map_new VALUES (?, ?, ?, ?)", (z, x, tile_row, tile_id))
+    blob_bytes_after = conn.execute("SELECT COALESCE(SUM(length(tile_data)), 0) FROM images_new").fetchone()[0]
+
+    conn.executescript(f"""
+    {'DROP VIEW tiles' if is_view else 'DROP TABLE tiles'};
+    DROP TABLE map;
+    DROP TABLE images;
+    ALTER TABLE map_new RENAME TO map;
+    ALTER TABLE images_new RENAME TO images;
+    CREATE UNIQUE INDEX map_index ON map (zoom_level, tile_column, tile_row);
+    CREATE UNIQUE INDEX images_id ON images (tile_id);
+    DROP INDEX images_new_id;
+    CREATE VIEW tiles AS
+        SELECT map.zoom_level AS zoom_level, map.tile_column AS tile_column,
+               map.tile_row AS tile_row, images.tile_data AS tile_data
+        FROM map JOIN images ON images.tile_id = map.tile_id;
+    """)
+    conn.commit()
+    conn.execute("VACUUM")
+    conn.close()
+
+    # 회수 용량 = 제거된 blob 바이트 (손상 타일 + 중복/빈 타일), 스키마/인덱스 크기는 제외
+    print_report(classified, blob_bytes_before - blob_bytes_after)
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("path", help="타일 폴더 ({z}/{x}/{y}.ext) 또는 .mbtiles 파일")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="검증 프로세스 수")
+    parser.add_argument("--tile_dir", type=str, default=None, help="MBTiles 모드: 손상 타일의 원본 파일을 지울 다운로드 폴더")
+    parser.add_argument("--failed_log", type=str, default=FAILED_LOG, help="손상 타일 재다운로드 목록")
+    parser.add_argument("--placeholder_min_count", type=int, default=50, help="이 횟수 이상 반복되는 이미지는 placeholder 후보로 출력 (자동 병합하지 않음)")
+    parser.add_argument("--placeholder_hash", nargs="*", default=[], help="placeholder로 병합해 204로 응답할 픽셀 해시 (md5)")
+    parser.add_argument("--dry_run", action="store_true", help="리포트만 출력하고 수정하지 않음")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if os.path.isdir(args.path):
+        validate_dir(args.path, args)
+    else:
+        validate_mbtiles(args.path, args)
@@ -0,0 +1,176 @@
+import sqlite3, os
+import argparse
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+# ✅ 포맷별 확장자 / 메타데이터 설명
+FORMATS = {
+    'png': ('.png', 'OSM tiles for Korea'),
+    'jpeg': ('.jpeg', 'VWorld tiles for Korea'),
+}
+
+def encode_tile(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+# ✅ 인덱스 없이 테이블만 생성 (인덱스는 병합 후 한 번만 생성)
+def init_tiles_table(conn):
+    conn.executescript("""
+    PRAGMA journal_mode=OFF;
+    PRAGMA synchronous=OFF;
+    CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+    """)
+
+def init_db(path, fmt):
+    conn = sqlite3.connect(path)
+    init_tiles_table(conn)
+    conn.execute("CREATE TABLE metadata (name TEXT, value TEXT)")
+    metadata = [
+        ('name', 'Korea Map'),
+        ('format', fmt),
+        ('type', 'baselayer'),
+        ('version', '1.0'),
+        ('description', FORMATS[fmt][1]),
+        ('minzoom', '5'),
+        ('maxzoom', '17'),
+        ('bounds', '124.5,33.0,131.0,39.6'),
+        ('center', '127.0,36.3,7'),
+    ]
+    conn.executemany("INSERT INTO metadata VALUES (?, ?)", metadata)
+    conn.commit()
+    return conn
+
+# ✅ 작업 분할: zoom 단위, 또는 (zoom, x 컬럼 묶음) 단위
+def plan_jobs(tile_dir, split, processes):
+    jobs = []
+    for z in sorted(os.listdir(tile_dir), key=lambda v: int(v) if v.isdigit() else -1):
+        if not z.isdigit():
+            continue
+        xs = sorted(x for x in os.listdir(os.path.join(tile_dir, z)) if x.isdigit())
+        if not xs:
+            continue
+        if split == "zoom":
+            jobs.append((z, xs))
+            continue
+        chunk = max(1, -(-len(xs) // processes))
+        for i in range(0, len(xs), chunk):
+            jobs.append((z, xs[i:i + chunk]))
+    return jobs
+
+# ✅ 워커: 자기 몫의 타일을 임시 MBTiles에 기록
+def build_part(tile_dir, z, xs, ext, part_path):
+    conn = sqlite3.connect(part_path)
+    init_tiles_table(conn)
+    rows = []
+    count = 0
+    for x in xs:
+        for y_file in os.listdir(os.path.join(tile_dir, z, x)):
+            if not y_file.endswith(ext):
+                continue
+            y = y_file.replace(ext, "")
+            full_path = os.path.join(tile_dir, z, x, y_file)
+            try:
+                y_mbtiles = (2 ** int(z) - 1) - int(y)
+                rows.append((int(z), int(x), y_mbtiles, encode_tile(full_path)))
+            except Exception as e:
+                print(f"[✗] {z}/{x}/{y} - {e}")
+        if len(rows) >= 1000:
+            conn.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)", rows)
+            count += len(rows)
+            rows = []
+    conn.executemany("INSERT INTO tiles VALUES (?, ?, ?, ?)", rows)
+    count += len(rows)
+    conn.commit()
+    conn.close()
+    return part_path, count
+
+# ✅ ATTACH + INSERT ... SELECT 로 병합 후 인덱스 생성
+def merge_parts(mbtiles_path, fmt, part_paths):
+    conn = init_db(mbtiles_path, fmt)
+    for part_path in part_paths:
+        conn.execute("ATTACH DATABASE ? AS part", (part_path,))
+        conn.execute("INSERT INTO tiles SELECT * FROM part.tiles")
+        conn.commit()
+        conn.execute("DETACH DATABASE part")
+    # 중복 키(예: 5.png / 05.png)는 기존 writer의 INSERT OR REPLACE처럼 마지막 행만 남김
+    conn.execute("""
+        DELETE FROM tiles WHERE rowid NOT IN (
+            SELECT MAX(rowid) FROM tiles GROUP BY zoom_level, tile_column, tile_row
+        )
+    """)
+    conn.execute("CREATE UNIQUE INDEX tile_index on tiles (zoom_level, tile_column, tile_row)")
+    conn.commit()
+    total = conn.execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+    conn.close()
+    return total
+
+def walk_tiles(tile_dir, mbtiles_path, fmt="png", processes=4, split="column"):
+    ext = FORMATS[fmt][0]
+    work_dir = tempfile.mkdtemp(prefix="mbtiles_parts_", dir=os.path.dirname(os.path.abspath(mbtiles_path)))
+    try:
+        jobs = plan_jobs(tile_dir, split, processes)
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            futures = [
+                executor.submit(build_part, tile_dir, z, xs, ext, os.path.join(work_dir, f"part_{i}.mbtiles"))
+                for i, (z, xs) in enumerate(jobs)
+            ]
+            results = [f.result() for f in futures]
+        # 임시 파일에 병합한 뒤 성공했을 때만 기존 결과 파일을 교체
+        merged_path = os.path.join(work_dir, "merged.mbtiles")
+        total = merge_parts(merged_path, fmt, [path for path, _ in results])
+        os.replace(merged_path, mbtiles_path)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"[✓] 변환 완료: {mbtiles_path} ({total} tiles, {len(jobs)} jobs, {processes} processes)")
+    return total
+
+# ✅ 벤치마크용 합성 타일 트리 생성
+def make_synthetic_tree(tile_dir, ext, min_zoom, max_zoom, tile_bytes):
+    payload = os.urandom(tile_bytes)
+    for z in range(min_zoom, max_zoom + 1):
+        n = 2 ** (z - min_zoom + 2)
+        for x in range(n):
+            x_dir = os.path.join(tile_dir, str(z), str(x))
+            os.makedirs(x_dir, exist_ok=True)
+            for y in range(n):
+                with open(os.path.join(x_dir, f"{y}{ext}"), "wb") as f:
+                    f.write(payload)
+
+def benchmark(args):
+    ext = FORMATS[args.format][0]
+    work_dir = tempfile.mkdtemp(prefix="mbtiles_bench_")
+    try:
+        tile_dir = os.path.join(work_dir, "tiles")
+        make_synthetic_tree(tile_dir, ext, args.bench_min_zoom, args.bench_max_zoom, args.bench_tile_bytes)
+        for processes in (1, 2, 4, 8):
+            out = os.path.join(work_dir, f"bench_{processes}.mbtiles")
+            start = time.perf_counter()
+            total = walk_tiles(tile_dir, out, args.format, processes, args.split)
+            elapsed = time.perf_counter() - start
+            print(f"[bench] processes={processes} split={args.split} tiles={total} wall={elapsed:.2f}s")
+            os.remove(out)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--input', type=str, default="./osm_tiles_korea_by_zoom", help='타일 폴더 ({z}/{x}/{y}.ext)')
+    parser.add_argument('--output', type=str, default="./osm_korea.mbtiles", help='출력 MBTiles 경로')
+    parser.add_argument('--format', choices=sorted(FORMATS), default='png', help='타일 포맷')
+    parser.add_argument('--processes', type=int, default=os.cpu_count() or 1, help='워커 프로세스 수')
+    parser.add_argument('--split', choices=['zoom', 'column'], default='column', help='작업 분할 기준 (zoom 또는 x 컬럼 범위)')
+    parser.add_argument('--benchmark', action='store_true', help='합성 타일 트리로 1/2/4/8 프로세스 시간 측정')
+    parser.add_argument('--bench_min_zoom', type=int, default=5)
+    parser.add_argument('--bench_max_zoom', type=int, default=9)
+    parser.add_argument('--bench_tile_bytes', type=int, default=20000)
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.benchmark:
+        benchmark(args)
+    else:
+        walk_tiles(args.input, args.output, args.format, args.processes, args.split)
@@ -0,0 +1,132 @@
+import sqlite3, os
+import argparse
+from io import BytesIO
+from PIL import Image
+
+# ✅ 원본 MBTiles(256px)로부터 @2x(512px) MBTiles 사전 생성
+
+def init_db(path, min_zoom, max_zoom, description):
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    cursor.executescript("""
+    CREATE TABLE metadata (name TEXT, value TEXT);
+    CREATE TABLE tiles (zoom_level INTEGER, tile_column INTEGER, tile_row INTEGER, tile_data BLOB);
+    CREATE UNIQUE INDEX tile_index on tiles (zoom_level, tile_column, tile_row);
+    """)
+    metadata = [
+        ('name', 'Korea Map @2x'),
+        ('format', 'png'),
+        ('type', 'baselayer'),
+        ('version', '1.0'),
+        ('description', description),
+        ('minzoom', str(min_zoom)),
+        ('maxzoom', str(max_zoom)),
+        ('bounds', '124.5,33.0,131.0,39.6'),
+        ('center', '127.0,36.3,7'),
+        ('scale', '2'),
+    ]
+    cursor.executemany("INSERT INTO metadata VALUES (?, ?)", metadata)
+    conn.commit()
+    return conn
+
+# ✅ 타일 조회 (XYZ y → MBTiles TMS y)
+def get_tile_data(conn, z, x, y):
+    row = conn.execute("""
+        SELECT tile_data FROM tiles
+        WHERE zoom_level=? AND tile_column=? AND tile_row=?
+    """, (z, x, (2 ** z - 1) - y)).fetchone()
+    return row[0] if row else None
+
+# ✅ validate_tiles.py 가 병합한 placeholder blob 목록 (서버와 같은 규칙: 데이터 없음 = 투명)
+def load_placeholders(conn):
+    try:
+        rows = conn.execute("SELECT tile_data FROM images WHERE tile_id LIKE 'placeholder:%'").fetchall()
+    except sqlite3.OperationalError:
+        return set()
+    return {row[0] for row in rows}
+
+# ✅ 자식 타일이 없으면 하위 줌 타일을 잘라 확대 (서버 fallback과 동일)
+#    placeholder 자리는 PLACEHOLDER 를 돌려 투명하게 남김
+PLACEHOLDER = object()
+
+def render_child(conn, z, x, y, fallback_min_zoom, placeholders):
+    tile_data = get_tile_data(conn, z, x, y)
+    if tile_data in placeholders:
+        return PLACEHOLDER
+    if tile_data:
+        return Image.open(BytesIO(tile_data))
+
+    for fallback_z in range(z - 1, fallback_min_zoom - 1, -1):
+        scale = 2 ** (z - fallback_z)
+        tile_data = get_tile_data(conn, fallback_z, x // scale, y // scale)
+        if not tile_data:
+            continue
+        if tile_data in placeholders:
+            return PLACEHOLDER
+        img = Image.open(BytesIO(tile_data))
+        dx = (x % scale) * (256 // scale)
+        dy = (y % scale) * (256 // scale)
+        box = (dx, dy, dx + 256 // scale, dy + 256 // scale)
+        return img.crop(box).resize((256, 256), resample=Image.LANCZOS)
+    return None
+
+def assemble_retina_tile(conn, z, x, y, fallback_min_zoom, placeholders):
+    canvas = Image.new('RGBA', (512, 512))
+    found = False
+    for i in range(2):
+        for j in range(2):
+            child = render_child(conn, z + 1, 2 * x + i, 2 * y + j, fallback_min_zoom, placeholders)
+            if child is None or child is PLACEHOLDER:
+                continue
+            canvas.paste(child, (i * 256, j * 256))
+            found = True
+    if not found:
+        return None
+
+    output = BytesIO()
+    canvas.save(output, format='PNG')
+    return output.getvalue()
+
+def build(src_path, dst_path, min_zoom, max_zoom, fallback_min_zoom):
+    src = sqlite3.connect(src_path)
+    dst = init_db(dst_path, min_zoom, max_zoom, f"@2x tiles assembled from {os.path.basename(src_path)}")
+    placeholders = load_placeholders(src)
+
+    for z in range(min_zoom, max_zoom + 1):
+        # ✅ z 또는 z+1 에 타일이 있는 (x, y) 만 대상
+        parents = set()
+        for zoom_level, x, tile_row in src.execute(
+                "SELECT zoom_level, tile_column, tile_row FROM tiles WHERE zoom_level IN (?, ?)", (z, z + 1)):
+            y = (2 ** zoom_level - 1) - tile_row
+            if zoom_level == z + 1:
+                x, y = x // 2, y // 2
+            parents.add((x, y))
+
+        count = 0
+        for x, y in parents:
+            data = assemble_retina_tile(src, z, x, y, fallback_min_zoom, placeholders)
+            if data is None:
+                continue
+            dst.execute("INSERT OR REPLACE INTO tiles VALUES (?, ?, ?, ?)", (z, x, (2 ** z - 1) - y, data))
+            count += 1
+        dst.commit()
+        print(f"[Zoom {z}] @2x tiles={count}")
+
+    src.close()
+    dst.close()
+    print(f"[✓] 변환 완료: {dst_path}")
+
+def parse_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--input', type=str, default="./osm_korea.mbtiles", help='원본 MBTiles 경로')
+    parser.add_argument('--output', type=str, default="./osm_korea@2x.mbtiles", help='출력 @2x MBTiles 경로')
+    parser.add_argument('--min_zoom', type=int, default=5, help='최소 줌 레벨')
+    parser.add_argument('--max_zoom', type=int, default=16, help='최대 줌 레벨 (z+1 자식 사용)')
+    parser.add_argument('--fallback_min_zoom', type=int, default=12, help='자식 타일이 없을 때 fallback 허용 최소 줌 (서버 --min_zoom)')
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    build(args.input, args.output, args.min_zoom, args.max_zoom, args.fallback_min_zoom)